@@ -16,6 +16,13 @@ import time
 import math
 import threading
 import signal
+import json
+import socketserver
+import sqlite3
+import queue
+import hashlib
+import asyncio
+import abc
 
 from typing import *
 
@@ -169,8 +176,123 @@ class CSignature(NamedTuple):
     arg_types: List[str]
 
 
+class StepResult(NamedTuple):
+    suite: str
+    func: str
+    step: str
+    status: str  # One of "pass", "fail", "timeout", "error"
+    returncode: Optional[int]
+    time_ms: float
+    output_digest: Optional[str] = None
 
-class TestRunner:
+
+class StepLog(TextInterface):
+    # Buffers a step's lines so that concurrent steps print in order
+
+    def __init__(self):
+        self.lines = []
+        self.result: Optional[StepResult] = None
+
+    def logError(self, s):
+        self.lines.append((logE, s))
+
+    def logInfo(self, s):
+        self.lines.append((logI, s))
+
+    def logPass(self, s):
+        self.lines.append((logP, s))
+
+    def logAccent(self, s):
+        self.lines.append((logA, s))
+
+    def logWarn(self, s):
+        self.lines.append((logW, s))
+
+    def flush(self):
+        for log, s in self.lines:
+            log(s)
+        self.lines = []
+
+
+class ProcResult(NamedTuple):
+    returncode: Optional[int]
+    stdout: bytes
+    stderr: bytes
+    time_ms: float
+    timed_out: bool
+
+
+if is_windows:
+    PROCESS_GROUP_ARGS = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    PROCESS_GROUP_ARGS = {"start_new_session": True}
+
+
+def kill_process_group(proc):
+    # The group can outlive its leader
+    try:
+        if is_windows:
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                capture_output=True, stdin=subprocess.DEVNULL)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class AsyncEngine:
+    # Runs the child processes of one test run, each in its own process group
+
+    STAGES = ("compile", "link", "run")
+
+    def __init__(self, jobs: Optional[int] = None):
+        if jobs is None:
+            # Builds shouldn't slow down (and time out) running steps
+            shared = asyncio.Semaphore(os.cpu_count() or 1)
+            self.limits = {stage: shared for stage in self.STAGES}
+        else:
+            self.limits = {stage: asyncio.Semaphore(jobs) for stage in self.STAGES}
+        self.procs = set()
+        self.cancelled = False
+
+    async def exec(self, stage: str, command: List[str], timeout=None, cwd=None) -> ProcResult:
+        async with self.limits[stage]:
+            if self.cancelled:
+                raise asyncio.CancelledError
+            t1 = time.perf_counter_ns()
+            proc = await asyncio.create_subprocess_exec(*command,
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                cwd=cwd, **PROCESS_GROUP_ARGS)
+            self.procs.add(proc)
+            try:
+                if self.cancelled:
+                    kill_process_group(proc)
+                timed_out = False
+                try:
+                    out, err = await asyncio.wait_for(proc.communicate(), timeout)
+                except asyncio.TimeoutError:
+                    kill_process_group(proc)
+                    out, err = await proc.communicate()
+                    timed_out = True
+            except asyncio.CancelledError:
+                # e.g. Ctrl-C under asyncio.run
+                kill_process_group(proc)
+                await proc.wait()
+                raise
+            finally:
+                self.procs.discard(proc)
+            if self.cancelled:
+                raise asyncio.CancelledError
+            timeMS = (time.perf_counter_ns() - t1) / 1e6
+            return ProcResult(proc.returncode, out, err, timeMS, timed_out)
+
+    def cancel(self):
+        self.cancelled = True
+        for proc in list(self.procs):
+            kill_process_group(proc)
+
+
+class TestRunner(abc.ABC):
     def __init__(self, root, tpath, tmp, suite, test, steps):
         self.root = root
         self.test_path = tpath
@@ -180,8 +302,55 @@ class TestRunner:
         self.steps = steps
         self.abs_path = None
 
-    def exec_simple(self):
-        pass
+    def make_result(self, step, status, returncode=None, time_ms=0.0, output=None):
+        digest = hashlib.blake2b(output, digest_size=16).hexdigest() if output is not None else None
+        return StepResult(self.suite, self.test, step, status, returncode, time_ms, digest)
+
+    def prebuild(self, engine: "AsyncEngine") -> Dict[str, Awaitable[Tuple[bool, StepLog]]]:
+        # Builds keyed by their output path, which must be unique across runners
+        return {}
+
+    @abc.abstractmethod
+    def step_jobs(self, engine: "AsyncEngine") -> List[Awaitable[StepLog]]:
+        # One coroutine per step, each returning the step's log with its result
+        ...
+
+
+def build_stamp(command: List[str], sources: List[pathlib.Path]):
+    # The command and the inputs (by path, mtime and size) of an artifact
+    lines = [" ".join(command)]
+    for src in dict.fromkeys(src.resolve() for src in sources):
+        st = src.stat()
+        lines.append(f"{src} {st.st_mtime_ns} {st.st_size}")
+    return "\n".join(lines)
+
+def stamp_path(target: pathlib.Path):
+    return target.with_name(target.name + ".stamp")
+
+def dep_path(target: pathlib.Path):
+    return target.with_name(target.name + ".d")
+
+def read_depfile(path: pathlib.Path):
+    # "target: source header \" as written by gcc -MMD
+    text = path.read_text().replace("\\\n", " ")
+    _, _, deps = text.partition(": ")
+    return [pathlib.Path(d.replace("\\ ", " ")) for d in re.split(r"(?<!\\)\s+", deps.strip()) if d]
+
+def is_up_to_date(target: pathlib.Path, command: List[str]):
+    # Lets a warm tmp dir (i.e. daemon mode) skip gcc
+    try:
+        stamp = stamp_path(target).read_text()
+        sources = [pathlib.Path(line.rsplit(" ", 2)[0]) for line in stamp.splitlines()[1:]]
+        return target.exists() and stamp == build_stamp(command, sources)
+    except OSError:
+        return False
+
+def mark_up_to_date(target: pathlib.Path, command: List[str], sources: List[pathlib.Path]):
+    try:
+        sources = [*sources, *read_depfile(dep_path(target))]
+        stamp_path(target).write_text(build_stamp(command, sources))
+    except OSError:
+        stamp_path(target).unlink(missing_ok=True)
 
 
 class GCCRunner(TestRunner):
@@ -189,7 +358,10 @@ class GCCRunner(TestRunner):
         super().__init__(root, tpath, tmp, suite, test, steps)
         self.source_path_root = pathlib.Path(root) / suite / test
         self.test_path_root = pathlib.Path(tpath) / suite / test
-        self.compiled_files = []
+        # Functions can have sources with the same name
+        self.out_path = self.tmp_path / suite / test
+        self.out_path.mkdir(parents=True, exist_ok=True)
+        self.builds: Dict[str, "asyncio.Task"] = {}
 
 
     def object_file_name(self, fpath: str):
@@ -204,47 +376,72 @@ class GCCRunner(TestRunner):
             return path.with_suffix(".o")
 
 
-    def compile_object(self, source_path, flags=("-Wall", "-lm"), post_flags=tuple(), disp_name="source"):
+    async def compile_object(self, engine: AsyncEngine, log: StepLog, source_path,
+                             flags=("-Wall", "-lm"), post_flags=tuple(), disp_name="source", stage="compile"):
 
         stem = source_path.stem
-        objfile = self.tmp_path / stem
+        objfile = self.out_path / stem
 
-        command = ["gcc", *flags, "-o", str(objfile), str(source_path), *post_flags]
+        target = objfile.with_suffix(EXECUTABLE_EXT)
+        command = ["gcc", *flags, "-MMD", "-MF", str(dep_path(target)),
+                   "-o", str(objfile), str(source_path), *post_flags]
+        if is_up_to_date(target, command):
+            log.logInfo(f"  [GCC] {disp_name.capitalize()} is up to date")
+            return True
 
-        t1 = time.perf_counter_ns()
-        compile_proc = subprocess.run(command, capture_output=True, stdin=subprocess.DEVNULL)
-        t2 = time.perf_counter_ns()
-        timeMS = (t2 - t1) / 1e6
+        compile_proc = await engine.exec(stage, command)
 
         err_out = compile_proc.stderr.decode()
 
         if compile_proc.returncode != 0:
-            logE(indent_text(err_out, 2))
+            log.logError(indent_text(err_out, 2))
             return False
+        libs = [pathlib.Path(f) for f in post_flags if f.endswith(SHAREDLIB_EXT)]
+        mark_up_to_date(target, command, libs)
 
         if err_out:
-            logW(indent_text(err_out.strip(), 2))
+            log.logWarn(indent_text(err_out.strip(), 2))
 
         flags_join = " ".join(flags)
-        logP(f"  [GCC] Compiled {disp_name} in {timeMS:.1f}ms with flags '{flags_join}'")
+        log.logPass(f"  [GCC] Compiled {disp_name} in {compile_proc.time_ms:.1f}ms with flags '{flags_join}'")
         return True
 
-    def compile_shared(self, source_path):
+    async def compile_shared(self, engine: AsyncEngine, log: StepLog, source_path, disp_name="source"):
         stem = source_path.stem
-        sofile = (self.tmp_path / stem).with_suffix(SHAREDLIB_EXT)
+        sofile = (self.out_path / stem).with_suffix(SHAREDLIB_EXT)
 
-        command = ["gcc", "-shared", "-o", str(sofile), "-fPIC", str(source_path)]
+        command = ["gcc", "-shared", "-MMD", "-MF", str(dep_path(sofile)),
+                   "-o", str(sofile), "-fPIC", str(source_path)]
+        if is_up_to_date(sofile, command):
+            return True
 
-        compile_proc = subprocess.run(command, capture_output=True, stdin=subprocess.DEVNULL)
+        compile_proc = await engine.exec("compile", command)
 
         if compile_proc.returncode != 0:
             err_out = compile_proc.stderr.decode()
-            logE(indent_text(err_out, 2))
+            log.logError(indent_text(err_out, 2))
             return False
+        mark_up_to_date(sofile, command, [])
 
-        logI("  [GCC] Recompiled function into a shared library")
+        log.logInfo(f"  [GCC] Recompiled {disp_name} into a shared library")
         return True
 
+    async def build_source(self, engine: AsyncEngine, source_path):
+        log = StepLog()
+        disp_name = f"'{source_path.relative_to(self.root).as_posix()}'"
+        ok = await self.compile_object(engine, log, source_path, disp_name=disp_name) and \
+             await self.compile_shared(engine, log, source_path, disp_name)
+        return ok, log
+
+    def prebuild(self, engine: AsyncEngine):
+        for step in self.steps:
+            fname, _ = self.resolve_step_file(step)
+            if not fname or fname in self.builds: continue
+            source_path = self.source_path_root / fname
+            if source_path.exists():
+                self.builds[fname] = asyncio.ensure_future(self.build_source(engine, source_path))
+        return {str(self.out_path / fname): build for fname, build in self.builds.items()}
+
     def resolve_step_file(self, step: str):
         try:
             a, b = step.split("_")
@@ -255,55 +452,71 @@ class GCCRunner(TestRunner):
         except ValueError:
             return None, None
 
-    def exec_step(self, step: str):
+    async def exec_step(self, engine: AsyncEngine, step: str):
+        log = StepLog()
         fname, step_no = self.resolve_step_file(step)
         if not fname:
-            logE(f"Cannot resolve file for {step}")
-            return
+            log.logError(f"Cannot resolve file for {step}")
+            log.result = self.make_result(step, "error")
+            return log
 
         source_path = self.source_path_root / fname
         if not source_path.exists():
-            logE("File to be compiled does not exist")
-            return
-
-        logA(f"Checking step {step_no} in '{source_path.name}'")
-        if fname in self.compiled_files:
-            logI("  File has already been compiled")
+            log.logError("File to be compiled does not exist")
+            log.result = self.make_result(step, "error")
+            return log
+
+        log.logAccent(f"Checking step {step_no} in '{source_path.relative_to(self.root).as_posix()}'")
+
+        build = self.builds.get(fname)
+        if build is None:
+            raise RuntimeError(f"{source_path} was not built by prebuild()")
+        ok, _ = await build
+        if ok:
+            log.logInfo("  File has already been compiled")
         else:
-            if not self.compile_object(source_path):return
-            if not self.compile_shared(source_path):return
-            self.compiled_files.append(fname)
+            log.logError("  File failed to compile")
+        if not ok:
+            log.result = self.make_result(step, "error")
+            return log
 
-        sofile = (self.tmp_path / fname).with_suffix(SHAREDLIB_EXT)
+        sofile = (self.out_path / fname).with_suffix(SHAREDLIB_EXT)
         step_path = self.test_path_root / step
 
-        if not self.compile_object(step_path,
-            post_flags=(str(sofile),), disp_name=f"'{step}'"): return
+        if not await self.compile_object(engine, log, step_path,
+            post_flags=(str(sofile),), disp_name=f"'{step}'", stage="link"):
+            log.result = self.make_result(step, "error")
+            return log
 
-        exec_path = (self.tmp_path / step).with_suffix(EXECUTABLE_EXT)
+        exec_path = (self.out_path / step).with_suffix(EXECUTABLE_EXT)
         command = [str(exec_path)]
 
-        try:
-            test_proc = subprocess.run(command, capture_output=True, stdin=subprocess.DEVNULL, timeout=1)
-        except subprocess.TimeoutExpired:
-            logE("Process timed out and is terminated")
-            return False
+        # Files a step writes stay apart from other steps and from the previous run
+        step_cwd = self.out_path / f"{exec_path.stem}.cwd"
+        shutil.rmtree(step_cwd, ignore_errors=True)
+        step_cwd.mkdir()
+
+        test_proc = await engine.exec("run", command, timeout=1, cwd=step_cwd)
+        if test_proc.timed_out:
+            log.logError("Process timed out and is terminated")
+            log.result = self.make_result(step, "timeout", None, test_proc.time_ms)
+            return log
 
         if test_proc.returncode != 0:
             err_out = test_proc.stderr.decode()
-            logE(f"  Process exited with code {test_proc.returncode}")
-            logE(indent_text(err_out, 2))
-            return False
+            log.logError(f"  Process exited with code {test_proc.returncode}")
+            log.logError(indent_text(err_out, 2))
+            log.result = self.make_result(step, "fail", test_proc.returncode,
+                                          test_proc.time_ms, test_proc.stdout)
         else:
             std_out = test_proc.stdout.decode()
-            logP(indent_text(std_out, 2))
-            return True
+            log.logPass(indent_text(std_out, 2))
+            log.result = self.make_result(step, "pass", 0, test_proc.time_ms, test_proc.stdout)
+        return log
 
 
-    def exec_simple(self):
-        for step in self.steps:
-            self.exec_step(step)
-            logI("")
+    def step_jobs(self, engine: AsyncEngine):
+        return [self.exec_step(engine, step) for step in self.steps]
 
 class ProbingExecutor:
 
@@ -318,6 +531,16 @@ class ProbingExecutor:
         self.prelim_checked = False
         self.prev_path = None
 
+        # Keep the tmp dir (and so compiled artifacts) between runs
+        self.warm = False
+        self.result_listeners: List[Callable[[StepResult], None]] = []
+        self.jobs = config.jobs
+
+        self.store: Optional[ResultsStore] = None
+        if config.results_db:
+            self.store = ResultsStore(config.results_db)
+            self.result_listeners.append(self.store.record)
+
         # Variables only set during test execution
 
         self._path: str = ""
@@ -327,11 +550,13 @@ class ProbingExecutor:
         self._total_steps = 0
 
         self._tmp_dir: str = ""
+        self._stop_event: Optional[threading.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._engine: Optional[AsyncEngine] = None
 
 
-    def init_probe(self):
-        if self.ready: return
-        self.ready = False
+    def init_probe(self, refresh=False):
+        if self.ready and not refresh: return
         path, tpath = self.config.project_path, self.config.tests_path
         if not os.path.isabs(path):
             logE("Test path not absolute")
@@ -359,6 +584,8 @@ class ProbingExecutor:
 
         tmp = os.path.join(path, ".chk2mp3/")
         if os.path.isdir(tmp):
+            if self.warm and self._tmp_dir == tmp:
+                return True
             shutil.rmtree(tmp)
         os.mkdir(tmp)
 
@@ -377,18 +604,111 @@ class ProbingExecutor:
         self.prev_path = path
         return True
 
-    def _checked_run(self):
+    async def _checked_run(self):
         self.print_title()
-        for test in self._test_names:
-            runner = self._resolve_runner(test)
-            runner.exec_simple()
-        logI(f"Finished all {self._total_steps} steps")
+        engine = self._engine = AsyncEngine(self.jobs)
+        if self._stop_event.is_set():
+            engine.cancel()
+
+        try:
+            completed = await self._run_steps(engine)
+        except BaseException:
+            # Don't leave children running when the run errors out or is interrupted
+            engine.cancel()
+            raise
+
+        if completed:
+            logI(f"Finished all {self._total_steps} steps")
+        else:
+            logW("Run cancelled")
+        return completed
+
+    async def _run_steps(self, engine: "AsyncEngine"):
+        runners = [self._resolve_runner(test) for test in self._test_names]
+        if not await self._prebuild(engine, runners):
+            return False
+
+        tasks = []
+        for runner in runners:
+            tasks.extend(asyncio.ensure_future(job) for job in runner.step_jobs(engine))
+
+        # Steps run ahead as far as the stage limits allow, but are reported in order
+        for task in tasks:
+            try:
+                log = await task
+            except asyncio.CancelledError:
+                if not engine.cancelled:
+                    raise
+                break
+            if engine.cancelled:
+                break
+            log.flush()
+            if log.result is not None:
+                self._emit_result(log.result)
+            logI("")
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return not engine.cancelled
+
+    async def _prebuild(self, engine: "AsyncEngine", runners: List[TestRunner]):
+        # Compile every student source in parallel and report them together
+        builds = {}
+        for runner in runners:
+            for out, build in runner.prebuild(engine).items():
+                name = os.path.relpath(out, self._tmp_dir)
+                assert name not in builds, f"Two builds would write to {name}"
+                builds[name] = build
+        if not builds:
+            return True
+
+        logA(f"Compiling {len(builds)} source files")
+        results = await asyncio.gather(*builds.values(), return_exceptions=True)
+        if engine.cancelled:
+            return False
+
+        failed = []
+        for name, result in zip(builds, results):
+            if isinstance(result, BaseException):
+                raise result
+            ok, log = result
+            log.flush()
+            if not ok:
+                failed.append(name)
+        if failed:
+            logE(f"{len(failed)} of {len(builds)} source files failed to compile: {', '.join(failed)}")
+            logE("Their steps will be reported as errors")
+        else:
+            logP(f"All {len(builds)} source files compiled")
+        logI("")
+        return True
+
+    async def _run_async(self):
+        self._loop = asyncio.get_running_loop()
+        try:
+            return await self._checked_run()
+        finally:
+            self._loop = self._engine = None
 
     def _resolve_runner(self, test) -> TestRunner:
         factory =  self.runners["default"]
         steps = self.suites[self._suite_name][test]
         return factory(self._path, self._tpath, self._tmp_dir, self._suite_name, test, steps)
 
+    def _emit_result(self, result: StepResult):
+        for listener in self.result_listeners:
+            listener(result)
+
+    def cancel(self, stop_event: Optional[threading.Event] = None):
+        # Safe to call from any thread. Without stop_event, cancels the active run
+        if stop_event is None:
+            stop_event = self._stop_event
+        if stop_event is None:
+            return
+        stop_event.set()
+        loop, engine = self._loop, self._engine
+        if stop_event is self._stop_event and loop is not None and engine is not None:
+            loop.call_soon_threadsafe(engine.cancel)
+
     def print_title(self):
         logI("=" * CONSOLE_WIDTH)
         title = f"{self._suite_name} (Total: " \
@@ -397,6 +717,8 @@ class ProbingExecutor:
         logI("=" * CONSOLE_WIDTH)
 
     def cleanup(self):
+        if self.warm:
+            return
         if not self.config.debug:
             shutil.rmtree(self._tmp_dir)
             logP("Cleaned up temporary directory")
@@ -409,19 +731,30 @@ class ProbingExecutor:
         self._tpath = test_path
         self._suite_name = suite
         self._test_names = tests
+        self._total_steps = 0
 
         suiteval = self.suites[suite]
         for test in tests:
             self._total_steps += len(suiteval[test])
 
-    def run_tests(self, path: str, test_path:str, suite: str, tests: List[str]):
+    def run_tests(self, path: str, test_path:str, suite: str, tests: List[str],
+                  stop_event: Optional[threading.Event] = None):
+        # Returns whether every step ran
         self.init_run_tests(path, test_path, suite, tests)
-        if not self.check_installs_once(path): return
-        if not self.create_tmp_dir(path): return
+        if not self.check_installs_once(path): return False
+        if not self.create_tmp_dir(path): return False
+        if self.store is not None:
+            self.store.begin_run(path, suite, tests)
+        completed = False
+        self._stop_event = stop_event or threading.Event()
         try:
-            self._checked_run()
+            completed = asyncio.run(self._run_async())
         finally:
+            self._stop_event = None
+            if self.store is not None:
+                self.store.end_run(completed)
             self.cleanup()
+        return completed
 
     def resolve_suite_and_tests(self, suite_no: Optional[int], tests: Optional[List[int]]):
         if suite_no is not None:
@@ -433,7 +766,7 @@ class ProbingExecutor:
         else:
             suite_name, suite = next(iter(self.suites.items()))
 
-        if test is None:
+        if tests is None:
             tests = range(len(suite))
 
         suite_vals = list(suite.items())
@@ -442,8 +775,8 @@ class ProbingExecutor:
         for test_no in tests:
             if not (0 <= test_no < len(suite)):
                 logE(f"Invalid test number {test_no}. Aborting...")
-                return False
-            test_names.append(suite_vals[test_no].key)
+                return None, []
+            test_names.append(suite_vals[test_no][0])
             # self._total_steps += len(suite_vals[test_no])
 
         return suite_name, test_names
@@ -451,9 +784,21 @@ class ProbingExecutor:
     def run_configured(self):
         self.init_probe()
         c = self.config
+        if c.report:
+            self.report_configured()
+            return
         suite, tests = self.resolve_suite_and_tests(c.suite_no, c.tests)
+        if suite is None: return
         self.run_tests(c.project_path, c.tests_path, suite, tests)
 
+    def report_configured(self):
+        c = self.config
+        suite = None
+        if c.suite_no is not None or c.report == "regressions":
+            suite, _ = self.resolve_suite_and_tests(c.suite_no, None)
+            if suite is None: return
+        print_report(self.store, c.report, c.project_path, suite)
+
     def query_suites(self):
         assert self.ready
         return list(self.suites.keys())
@@ -464,6 +809,208 @@ class ProbingExecutor:
         return list(suite.keys())
 
 
+RESULTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    submission TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    funcs TEXT NOT NULL,
+    started REAL NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS step_results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    submission TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    func TEXT NOT NULL,
+    step TEXT NOT NULL,
+    status TEXT NOT NULL,
+    returncode INTEGER,
+    time_ms REAL NOT NULL,
+    output_digest TEXT
+);
+CREATE TABLE IF NOT EXISTS func_stats (
+    submission TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    func TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    PRIMARY KEY (submission, suite, func)
+);
+CREATE INDEX IF NOT EXISTS idx_stats_suite ON func_stats(suite, func);
+CREATE INDEX IF NOT EXISTS idx_runs_submission ON runs(submission, suite, id);
+CREATE INDEX IF NOT EXISTS idx_results_run ON step_results(run_id, suite, func, step, status);
+CREATE INDEX IF NOT EXISTS idx_results_submission ON step_results(submission, run_id);
+CREATE INDEX IF NOT EXISTS idx_results_suite ON step_results(suite, func, status);
+CREATE INDEX IF NOT EXISTS idx_results_func ON step_results(func);
+CREATE INDEX IF NOT EXISTS idx_results_step ON step_results(step);
+CREATE INDEX IF NOT EXISTS idx_results_time ON step_results(time_ms);
+"""
+
+
+class ResultsStore:
+    # Step results are written in batches on a background thread
+
+    def __init__(self, db_path: str, batch_size=2000, batch_interval=0.2):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+
+        self.conn = self._connect()
+        self.conn.executescript(RESULTS_SCHEMA)
+
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        # Lets parallel graders append while reports are queried
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def begin_run(self, submission: str, suite: str, funcs: List[str]):
+        # Results recorded after this belong to the new run
+        self.queue.put(("run", (submission, suite, json.dumps(sorted(funcs)), time.time())))
+
+    def end_run(self, completed: bool):
+        self.queue.put(("end", completed))
+
+    def record(self, r: StepResult):
+        self.queue.put(("step", (r.suite, r.func, r.step, r.status,
+                                 r.returncode, r.time_ms, r.output_digest)))
+
+    def _write_loop(self):
+        conn = self._connect()
+        run = (None, None)  # (run id, submission)
+        done = False
+        while not done:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.batch_interval
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                done = True
+            if not batch:
+                continue
+            try:
+                run = self._write_batch(conn, batch, run)
+            except sqlite3.Error as e:
+                # e.g. the database stayed locked. Drop the batch but keep going
+                lost = sum(kind == "step" for kind, _ in batch)
+                logE(f"Failed to write {lost} results to {self.db_path}: {e}")
+                if any(kind == "run" for kind, _ in batch):
+                    run = (None, None)
+        conn.close()
+
+    @staticmethod
+    def _write_batch(conn, batch, run):
+        rows = []
+
+        with conn:
+            for kind, values in batch:
+                if kind == "step":
+                    if run[0] is not None:
+                        rows.append((*run, *values))
+                    continue
+
+                conn.executemany("INSERT INTO step_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                rows = []
+                if kind == "run":
+                    cur = conn.execute("INSERT INTO runs (submission, suite, funcs, started) "
+                                       "VALUES (?, ?, ?, ?)", values)
+                    run = (cur.lastrowid, values[0])
+                elif kind == "end" and values and run[0] is not None:
+                    # Stats only count a function's latest completed run
+                    conn.execute("UPDATE runs SET completed = 1 WHERE id = ?", (run[0],))
+                    conn.execute(
+                        "INSERT INTO func_stats SELECT submission, suite, func, run_id, COUNT(*), "
+                        "SUM(status = 'pass') FROM step_results WHERE run_id = ? "
+                        "GROUP BY submission, suite, func "
+                        "ON CONFLICT (submission, suite, func) DO UPDATE SET run_id = excluded.run_id, "
+                        "total = excluded.total, passed = excluded.passed", (run[0],))
+
+            conn.executemany("INSERT INTO step_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return run
+
+    def close(self):
+        self.queue.put(None)
+        self.writer.join()
+        self.conn.close()
+
+    def pass_rates(self, suite: Optional[str] = None):
+        # Over the latest completed run of each function in each submission
+        sql = "SELECT suite, func, COUNT(*), SUM(total), SUM(passed) FROM func_stats"
+        args = ()
+        if suite is not None:
+            sql += " WHERE suite = ?"
+            args = (suite,)
+        sql += " GROUP BY suite, func ORDER BY suite, func"
+        return [(s, f, subs, total, passed / total)
+                for s, f, subs, total, passed in self.conn.execute(sql, args)]
+
+    def slowest_steps(self, limit=10):
+        return self.conn.execute(
+            "SELECT submission, suite, func, step, time_ms FROM step_results "
+            "ORDER BY time_ms DESC LIMIT ?", (limit,)).fetchall()
+
+    def latest_runs(self, submission: str, suite: str):
+        # The latest completed run and the one before it that checked the same functions
+        runs, funcs = [], None
+        for run_id, run_funcs in self.conn.execute(
+                "SELECT id, funcs FROM runs WHERE submission = ? AND suite = ? AND completed = 1 "
+                "ORDER BY id DESC", (submission, suite)):
+            run_funcs = set(json.loads(run_funcs))
+            if funcs is None:
+                funcs = run_funcs
+                runs.append(run_id)
+            elif funcs <= run_funcs:
+                runs.append(run_id)
+                break
+        return runs[::-1]
+
+    def regressions(self, old_run: int, new_run: int):
+        # Steps that passed in old_run but not in new_run
+        return self.conn.execute(
+            "SELECT n.suite, n.func, n.step, n.status, n.returncode FROM step_results o "
+            "JOIN step_results n ON n.run_id = ? AND n.suite = o.suite AND n.func = o.func "
+            "AND n.step = o.step "
+            "WHERE o.run_id = ? AND o.status = 'pass' AND n.status != 'pass' "
+            "ORDER BY n.func, n.step", (new_run, old_run)).fetchall()
+
+
+def print_report(store: ResultsStore, report: str, submission: str, suite: Optional[str]):
+    if report == "pass-rates":
+        logA(f"{'Suite':<12}{'Function':<32}{'Submissions':>12}{'Steps':>8}{'Pass Rate':>12}")
+        for s, f, subs, total, rate in store.pass_rates(suite):
+            line = f"{s:<12}{f:<32}{subs:>12}{total:>8}{rate:>12.1%}"
+            if rate == 1: logP(line)
+            else: logW(line)
+
+    elif report == "slowest":
+        logA(f"{'Time':>10}  Step")
+        for sub, s, f, step, ms in store.slowest_steps():
+            logI(f"{ms:>8.1f}ms  {s}/{f}/{step} ({sub})")
+
+    elif report == "regressions":
+        runs = store.latest_runs(submission, suite) if suite else []
+        if len(runs) < 2:
+            logW("Need two completed runs of this suite, the older covering the newer's functions")
+            return
+        rows = store.regressions(*runs)
+        logA(f"Comparing run {runs[0]} to run {runs[1]} of {suite} for {submission}")
+        for s, f, step, status, code in rows:
+            logE(f"  {f}/{step} now {status} (exit code {code})")
+        if not rows:
+            logP("  No regressions")
+
+
 class ThreadSafeItemStore:
     # https://stackoverflow.com/questions/16745507/tkinter-how-to-use-threads-to-preventing-main-event-loop-from-freezing
     # https://stackoverflow.com/questions/156360/get-all-items-from-thread-queue
@@ -530,6 +1077,7 @@ class TkInterface(TextInterface):
         # Threading Objects
         self.log_queue = ThreadSafeItemStore()
         self.thread: Optional[threading.Thread] = None
+        self.stop_event: Optional[threading.Event] = None
 
         self.window.after(100, self.init_probe)
 
@@ -541,6 +1089,9 @@ class TkInterface(TextInterface):
         btn = Button(frame, text="Run Code Checker", command=self.check_code)
         btn.pack(side=LEFT)
 
+        btn4 = Button(frame, text="Stop", command=self.stop_code)
+        btn4.pack(side=LEFT)
+
         btn3 = Button(frame, text="Clear Window", command=self.clear_log)
         btn3.pack(side=LEFT)
 
@@ -607,13 +1158,19 @@ class TkInterface(TextInterface):
         if test == "All":
             test = self.executor.query_funcs(suite)
 
+        self.stop_event = threading.Event()
         self.thread = threading.Thread(target=self.check_code_new_thread, args=(suite,test))
         self.thread.start()
         self.window.after(100, self.process_log_queue)
 
+    def stop_code(self):
+        if self.thread is None:
+            return
+        self.executor.cancel(self.stop_event)
+
     def check_code_new_thread(self, suite, test):
         tpath = os.path.join(self.path, "tests")
-        self.executor.run_tests(self.path, tpath, suite, test)
+        self.executor.run_tests(self.path, tpath, suite, test, self.stop_event)
         self.thread = None
 
     def clear_log(self):
@@ -658,6 +1215,192 @@ class TkInterface(TextInterface):
         self.__unsafe_log(s, "t_magenta")
 
 
+class DaemonInterface(TextInterface):
+    # Log lines produced on a request thread go back to that request's client
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def _route(self, level, s, fallback):
+        sink = getattr(self.local, "sink", None)
+        if sink is None:
+            fallback(s)
+        else:
+            sink(level, str(s))
+
+    def logError(self, s):
+        self._route("error", s, super().logError)
+
+    def logInfo(self, s):
+        self._route("info", s, super().logInfo)
+
+    def logPass(self, s):
+        self._route("pass", s, super().logPass)
+
+    def logAccent(self, s):
+        self._route("accent", s, super().logAccent)
+
+    def logWarn(self, s):
+        self._route("warn", s, super().logWarn)
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    # One JSON-RPC 2.0 message per line in both directions
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.write_lock = threading.Lock()
+
+    def send(self, msg):
+        data = (json.dumps(msg) + "\n").encode()
+        with self.write_lock:
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                pass  # Client went away; the run still finishes
+
+    def respond(self, rid, result):
+        self.send({"jsonrpc": "2.0", "id": rid, "result": result})
+
+    def error(self, rid, code, message):
+        self.send({"jsonrpc": "2.0", "id": rid, "error": {"code": code, "message": message}})
+
+    def notify(self, method, params):
+        self.send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip(): continue
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                self.error(None, -32700, "Parse error")
+                continue
+            if not isinstance(msg, dict) or "method" not in msg:
+                self.error(None, -32600, "Invalid Request")
+                continue
+            self.server.dispatch(msg, self)
+
+
+class InvalidParams(Exception):
+    pass
+
+
+class CheckerDaemon(socketserver.ThreadingTCPServer):
+    # Keeps the executor warm between runs, which are serialized
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, executor: ProbingExecutor, port: int, router: DaemonInterface):
+        super().__init__(("127.0.0.1", port), DaemonRequestHandler)
+        self.executor = executor
+        self.router = router
+        executor.warm = True
+
+        self.run_lock = threading.Lock()
+        # Stop events of queued and active runs
+        self.runs: Dict[Tuple[DaemonRequestHandler, Any], threading.Event] = {}
+
+    def dispatch(self, msg, conn: DaemonRequestHandler):
+        rid = msg.get("id")
+        params = msg.get("params") or {}
+        method = msg["method"]
+        if not isinstance(params, dict):
+            conn.error(rid, -32602, "Invalid params: expected an object")
+            return
+
+        try:
+            if method == "list_suites":
+                self.list_suites(rid, params, conn)
+            elif method == "run":
+                self.runs[(conn, rid)] = threading.Event()
+                threading.Thread(target=self.run, args=(rid, params, conn), daemon=True).start()
+            elif method == "cancel":
+                self.cancel(rid, params, conn)
+            elif method == "shutdown":
+                conn.respond(rid, True)
+                threading.Thread(target=self.shutdown).start()
+            else:
+                conn.error(rid, -32601, f"Method not found: {method}")
+        except Exception as e:
+            conn.error(rid, -32603, f"Internal error: {e}")
+
+    def list_suites(self, rid, params, conn):
+        ex = self.executor
+        ex.init_probe(refresh=bool(params.get("refresh")))
+        conn.respond(rid, {suite: ex.query_funcs(suite) for suite in ex.query_suites()})
+
+    def cancel(self, rid, params, conn):
+        stop_event = self.runs.get((conn, params.get("run")))
+        if stop_event is not None:
+            self.executor.cancel(stop_event)
+        conn.respond(rid, stop_event is not None)
+
+    def run(self, rid, params, conn):
+        # Forget the run before answering, so that cancelling it afterwards responds false
+        key = (conn, rid)
+        try:
+            result = self._run(rid, params, conn)
+        except InvalidParams as e:
+            self.runs.pop(key, None)
+            conn.error(rid, -32602, str(e))
+        except Exception as e:
+            self.runs.pop(key, None)
+            conn.error(rid, -32603, f"Internal error: {e}")
+        else:
+            self.runs.pop(key, None)
+            conn.respond(rid, result)
+
+    def _run(self, rid, params, conn):
+        ex = self.executor
+        suite = params.get("suite")
+        funcs = params.get("funcs")
+        if not isinstance(suite, str):
+            raise InvalidParams("Invalid params: 'suite' must be a string")
+        if funcs is not None and not (isinstance(funcs, list) and all(isinstance(f, str) for f in funcs)):
+            raise InvalidParams("Invalid params: 'funcs' must be a list of strings")
+
+        stop_event = self.runs[(conn, rid)]
+        with self.run_lock:
+            if stop_event.is_set():
+                return {"total": 0, "cancelled": True}
+
+            ex.init_probe()
+            if suite not in ex.suites:
+                raise InvalidParams(f"Unknown suite: {suite}")
+            if not funcs:
+                funcs = ex.query_funcs(suite)
+            unknown = [f for f in funcs if f not in ex.suites[suite]]
+            if unknown:
+                raise InvalidParams(f"Unknown functions: {', '.join(unknown)}")
+
+            counts = {"pass": 0, "fail": 0, "timeout": 0, "error": 0}
+
+            def on_result(r: StepResult):
+                counts[r.status] += 1
+                conn.notify("step", {"run": rid, **r._asdict()})
+
+            def on_log(level, text):
+                conn.notify("log", {"run": rid, "level": level, "text": text})
+
+            self.router.local.sink = on_log
+            ex.result_listeners.append(on_result)
+            t1 = time.perf_counter_ns()
+            try:
+                completed = ex.run_tests(ex.config.project_path, ex.config.tests_path, suite, funcs, stop_event)
+            finally:
+                ex.result_listeners.remove(on_result)
+                self.router.local.sink = None
+            timeMS = (time.perf_counter_ns() - t1) / 1e6
+
+            return {"total": sum(counts.values()), "passed": counts["pass"],
+                    "failed": counts["fail"] + counts["timeout"] + counts["error"],
+                    "cancelled": not completed, "time_ms": timeMS}
+
+
 class InitConfig(NamedTuple):
     project_path: str  # Must be the absolute path
     tests_path: str
@@ -665,6 +1408,10 @@ class InitConfig(NamedTuple):
     suite_no: Optional[int]
     tests: Optional[List[int]]
     debug: bool
+    listen_port: Optional[int]
+    results_db: Optional[str]
+    report: Optional[str]
+    jobs: Optional[int]
 
 
 def init_config():
@@ -690,6 +1437,20 @@ def init_config():
         help="turn on debug mode (keeps temp folder)",
         action="store_true")
 
+    parser.add_argument("-l", metavar="PORT", type=int,
+        help="run as a daemon serving JSON-RPC requests on localhost PORT")
+
+    parser.add_argument("-o", metavar="DB",
+        help="record every step result into a SQLite database")
+
+    parser.add_argument("-r",
+        help="print a report from the -o database instead of running tests",
+        choices=["pass-rates", "slowest", "regressions"])
+
+    parser.add_argument("-j", metavar="JOBS", type=int,
+        help="specify how many processes each stage (compile, link, run) may use at once. "
+             "If unset, all stages share one process per CPU")
+
     args = parser.parse_args()
 
     if args.p:
@@ -698,26 +1459,57 @@ def init_config():
         project_path = os.getcwd()
 
     if args.t:
-        if os.path.isabs(s):
+        if os.path.isabs(args.t):
             tests_path = args.t
         else:
             tests_path = os.path.join(project_path, args.t)
     else:
         tests_path = os.path.join(project_path, "tests")
 
-    return InitConfig(project_path, tests_path, args.m, args.s, args.q, args.d)
+    if args.r and not args.o:
+        parser.error("-r requires a database given with -o")
+
+    return InitConfig(project_path, tests_path, args.m, args.s, args.q, args.d, args.l, args.o, args.r, args.j)
 
 RUNNERS = {"default": GCCRunner}
 
+def run_daemon(executor: ProbingExecutor, port: int, router: DaemonInterface):
+    executor.init_probe()
+    executor.check_installs_once(executor.config.project_path)
+
+    with CheckerDaemon(executor, port, router) as server:
+        logI(f"Checker daemon listening on 127.0.0.1:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+    if executor._tmp_dir and os.path.isdir(executor._tmp_dir):
+        executor.warm = False
+        executor.cleanup()
+
 def run_checker():
     config = init_config()
     executor = ProbingExecutor(config, RUNNERS)
+    try:
+        run_with_interface(executor)
+    finally:
+        if executor.store is not None:
+            executor.store.close()
+
+def run_with_interface(executor: ProbingExecutor):
+    config = executor.config
 
     global interface
 
+    if config.listen_port is not None:
+        interface = DaemonInterface()
+        run_daemon(executor, config.listen_port, interface)
+        return
+
     display = config.display_mode
     if display not in ["plain", "colored", "graphical"]:
-        if tk_lib_available:
+        if tk_lib_available and not config.report:
             display = "graphical"
         else:
             if is_linux or is_wsl or is_mac: